@@ -39,11 +39,17 @@ class WeakestSkillAgent(Agent):
     """Looks at each student's skill vector and learning style vector and uses 
     that information to decide what to teach next. Picks weakest skill and most
     dominant learner style.
+
+    If the environment tracks each student's weakest skill (large curricula)
+    it is read from the info instead of taking the argmin over every skill.
     """
 
     def __call__(self, state, reward, done, info):
-        student_skills = info[0]["student_skills"]
-        weakest_skill = np.argmin(student_skills)
+        if "student_weakest_skill" in info[0]:
+            weakest_skill = info[0]["student_weakest_skill"]
+        else:
+            student_skills = info[0]["student_skills"]
+            weakest_skill = np.argmin(student_skills)
         concept = weakest_skill
 
         student_learner_style = info[0]["student_learner_style"]
@@ -84,7 +90,7 @@ class MultiArmBandit(Agent):
 
 class MultiArmBanditEpsilonGreedy(MultiArmBandit):
     def __call__(self, state, reward, done, info):
-        if info[0]["question_idx"] == 0:  # Means we just started teaching a new student
+        if info[0]["new_session"]:  # Means we just started teaching a new student
             self.prev_action = 0
 
         # Expected reward update
@@ -114,7 +120,7 @@ class MultiArmBanditEpsilonSampleProb(MultiArmBandit):
     """
 
     def __call__(self, state, reward, done, info):
-        if info[0]["question_idx"] == 0:  # Means we just started teaching a new student
+        if info[0]["new_session"]:  # Means we just started teaching a new student
             self.prev_action = 0
 
         # Expected reward update
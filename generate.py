@@ -157,3 +157,30 @@ def learner_skills(c, avg_skill=0, specific_skill_fn=None):
     for i in range(c):
         skills[i] = specific_skill_fn(avg_skill, i)
     return skills
+
+
+def prerequisites(c, max_prereqs=3, window=50):
+    """Generate a sparse prerequisite graph over c concepts.
+
+        c: number of concepts
+        max_prereqs: the maximum number of prerequisites each concept can have
+        window: prerequisites of concept i are sampled from the `window`
+            concepts before it (keeps the graph a DAG and local, like a course
+            where each topic builds on recent topics)
+
+    Return (indptr, indices): the graph in CSR form, the prerequisites of
+        concept i are indices[indptr[i]:indptr[i + 1]]
+    """
+    n_prereqs = np.random.randint(0, max_prereqs + 1, size=c)
+    n_prereqs = np.minimum(n_prereqs, np.minimum(window, np.arange(c)))
+
+    indptr = np.zeros(c + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum(n_prereqs)
+    indices = np.zeros(indptr[-1], dtype=np.int64)
+    for i in np.nonzero(n_prereqs)[0]:
+        low = max(0, i - window)
+        indices[indptr[i] : indptr[i + 1]] = low + np.random.choice(
+            i - low, size=n_prereqs[i], replace=False
+        )
+
+    return indptr, indices
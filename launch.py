@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""Train several seeds of train.py at once and merge their results.
+
+Runs are written to the same layout as train.py, ie. <logdir>/<budget>/seed-<n>,
+and a cross-seed summary is written to <logdir>/<budget>/summary.csv and
+<logdir>/<budget>/episode_rewards.csv once every seed has finished.
+
+Each worker is pinned to its own set of cores and TensorFlow (--tf-threads)
+and BLAS are limited to that many threads so concurrent runs don't
+oversubscribe the machine.
+Extra arguments after `--` are passed through to train.py, eg.
+
+    python launch.py -k 4 -ns 1e6 -- --reward expected -s
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue
+import subprocess
+import argparse
+import sys
+import os
+
+import numpy as np
+
+
+def available_cpus():
+    """Return the CPUs this process is allowed to run on."""
+    if hasattr(os, "sched_getaffinity"):  # Linux only
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count()))
+
+
+def run_seed(seed, budget, logdir, cores, train_args):
+    """Run train.py for one seed pinned to `cores` (train.py pins itself with
+    --cpus), return its exit code.
+    """
+    run_dir = "{}/{}/seed-{}".format(logdir, budget, seed)
+    os.makedirs(run_dir, exist_ok=True)
+
+    n_threads = str(len(cores))
+    env = dict(
+        os.environ,
+        OMP_NUM_THREADS=n_threads,
+        MKL_NUM_THREADS=n_threads,
+        OPENBLAS_NUM_THREADS=n_threads,
+    )
+    cmd = [
+        sys.executable,
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "train.py"),
+        "--num-timesteps",
+        budget,
+        "--logdir",
+        logdir,
+        "--seed",
+        str(seed),
+        "--tf-threads",
+        n_threads,
+        "--cpus",
+        ",".join(str(c) for c in sorted(cores)),
+    ] + train_args
+
+    with open(run_dir + "/stdout.txt", "w") as out:
+        process = subprocess.run(cmd, env=env, stdout=out, stderr=subprocess.STDOUT)
+    return process.returncode
+
+
+def launch(seeds, budget, logdir, n_workers, cores_per_worker, train_args):
+    """Run every seed across `n_workers` concurrent workers.
+
+    Return returncodes: a dictionary that maps each seed to its exit code
+    """
+    if len(set(seeds)) != len(seeds):
+        raise ValueError(f"Seeds must be unique, runs would share a logdir: {seeds}")
+
+    # Hand out disjoint sets of cores, a worker returns its set when done
+    cpus = available_cpus()
+    if n_workers * cores_per_worker > len(cpus):
+        raise ValueError(
+            f"{n_workers} workers x {cores_per_worker} cores needs more than the "
+            f"{len(cpus)} available CPUs"
+        )
+    core_sets = Queue()
+    for w in range(n_workers):
+        core_sets.put(set(cpus[w * cores_per_worker : (w + 1) * cores_per_worker]))
+
+    def worker(seed):
+        cores = core_sets.get()
+        try:
+            print(f"Starting seed {seed} on cores {sorted(cores)}")
+            returncode = run_seed(seed, budget, logdir, cores, train_args)
+            print(f"Finished seed {seed} (exit code {returncode})")
+            return returncode
+        finally:
+            core_sets.put(cores)
+
+    with ThreadPoolExecutor(n_workers) as pool:
+        returncodes = list(pool.map(worker, seeds))
+    return dict(zip(seeds, returncodes))
+
+
+def read_monitor(filename):
+    """Return the episode rewards from a bench.Monitor monitor.csv."""
+    if not os.path.isfile(filename):
+        return np.zeros(0)
+    # First line is a json header, second line the column names (r,l,t)
+    rewards = np.genfromtxt(filename, delimiter=",", skip_header=2, usecols=0)
+    return np.atleast_1d(rewards)
+
+
+def read_progress(filename, column):
+    """Return a column from a logger progress.csv."""
+    if not os.path.isfile(filename):
+        return np.zeros(0)
+    progress = np.genfromtxt(filename, delimiter=",", names=True)
+    return np.atleast_1d(progress[column])
+
+
+def summarize(seeds, budget, logdir, returncodes):
+    """Merge the results of every seed into summary.csv (one row per seed plus
+    the mean and std across seeds) and episode_rewards.csv (the mean and std of
+    each episode's reward across seeds).
+    """
+    budget_dir = "{}/{}".format(logdir, budget)
+    rows = []
+    episode_rewards = []
+    for seed in seeds:
+        run_dir = "{}/seed-{}".format(budget_dir, seed)
+        rewards = read_monitor(run_dir + "/monitor.csv")
+        fps = read_progress(run_dir + "/progress.csv", "fps")
+        episode_rewards.append(rewards)
+        rows.append(
+            [
+                seed,
+                returncodes[seed],
+                len(rewards),
+                np.mean(rewards) if len(rewards) else np.nan,
+                rewards[-1] if len(rewards) else np.nan,
+                np.mean(fps) if len(fps) else np.nan,
+            ]
+        )
+
+    header = "seed,returncode,episodes,mean_reward,last_reward,mean_fps"
+    stats = np.array([row[2:] for row in rows], dtype=np.float64)
+    with open(budget_dir + "/summary.csv", "w") as f:
+        f.write(header + "\n")
+        for row in rows:
+            f.write(",".join(str(x) for x in row) + "\n")
+        for name, fn in [("mean", np.nanmean), ("std", np.nanstd)]:
+            values = fn(stats, axis=0) if len(stats) else []
+            f.write(",".join([name, ""] + [str(x) for x in values]) + "\n")
+
+    # Align episodes across seeds (seeds may have finished different numbers)
+    n_episodes = max([len(r) for r in episode_rewards] + [0])
+    merged = np.full((len(seeds), n_episodes), np.nan)
+    for i, rewards in enumerate(episode_rewards):
+        merged[i, : len(rewards)] = rewards
+    with open(budget_dir + "/episode_rewards.csv", "w") as f:
+        f.write("episode,mean,std,n_seeds\n")
+        for e in range(n_episodes):
+            r = merged[:, e][~np.isnan(merged[:, e])]
+            f.write(f"{e},{np.mean(r)},{np.std(r)},{len(r)}\n")
+
+    print(f"Saved summary of {len(seeds)} seeds to {budget_dir}")
+
+
+def main():
+    argv = sys.argv[1:]
+    train_args = []
+    if "--" in argv:
+        train_args = argv[argv.index("--") + 1 :]
+        argv = argv[: argv.index("--")]
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-ns", "--num-timesteps", type=str, default="1e6")
+    parser.add_argument("-ld", "--logdir", type=str, default="logs")
+    parser.add_argument("-sd", "--seeds", type=int, nargs="*", default=None)
+    parser.add_argument("-k", "--n-seeds", type=int, default=4)
+    parser.add_argument("-w", "--n-workers", type=int, default=None)
+    parser.add_argument("-c", "--cores-per-worker", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    # Pick random seeds the same way as train.py
+    if args.seeds:
+        seeds = args.seeds
+        if len(set(seeds)) != len(seeds):
+            parser.error("--seeds must be unique, runs would share a logdir")
+    else:
+        seeds = np.random.choice(np.arange(1, 1000), args.n_seeds, replace=False)
+        seeds = [int(seed) for seed in seeds]
+        print("Seeds are", seeds)
+
+    # Never give out more cores than this process may use
+    max_workers = len(available_cpus()) // args.cores_per_worker
+    if max_workers < 1:
+        parser.error("--cores-per-worker is larger than the number of CPUs")
+    n_workers = min(args.n_workers or max_workers, max_workers, len(seeds))
+
+    returncodes = launch(
+        seeds=seeds,
+        budget=args.num_timesteps,
+        logdir=args.logdir,
+        n_workers=n_workers,
+        cores_per_worker=args.cores_per_worker,
+        train_args=train_args,
+    )
+    summarize(seeds, args.num_timesteps, args.logdir, returncodes)
+
+
+if __name__ == "__main__":
+    main()
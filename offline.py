@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Generate offline datasets of simulated student interactions.
+
+A behaviour policy (one of the agents in agents.py) teaches the students of a
+`StudentEnv` and every interaction is written to sharded `.npy` arrays:
+
+    <outdir>/manifest.json
+    <outdir>/shard-00000/action.npy
+    <outdir>/shard-00000/correct.npy
+    ...
+
+Every shard shares the question bank built from the seed but has its own
+population of students. Shards are seeded from (seed, shard index) so the same
+seed always gives the same corpus no matter how many workers generate it, and
+`load_shards` memory-maps them without copying.
+"""
+
+from multiprocessing import Pool
+import argparse
+import json
+import os
+
+import numpy as np
+
+from agents import (
+    RandomAgent,
+    WeakestSkillAgent,
+    MultiArmBanditEpsilonGreedy,
+    MultiArmBanditEpsilonSampleProb,
+)
+from student_env import StudentEnv
+
+
+behaviour_policies = {
+    "random": RandomAgent,
+    "weakest_skill": WeakestSkillAgent,
+    "eps_greedy": MultiArmBanditEpsilonGreedy,
+    "sample_prob": MultiArmBanditEpsilonSampleProb,
+}
+
+# Name and dtype of each array stored per shard
+fields = {
+    "student_idx": np.int32,  # Student being taught
+    "question_idx": np.int32,  # Question asked after the example
+    "action": np.int32,  # Action taken (concept * 4 + learning style)
+    "question_concept": np.int32,  # Concept tested by the question
+    "correct": np.int8,  # Whether the student answered correctly
+    "p_correct": np.float32,  # Probability the student answers correctly
+    "done": np.bool_,  # Whether the episode ended on this step
+}
+
+
+def shard_seed(seed, shard_idx):
+    """Return the numpy seed for a shard (independent of the worker running it)."""
+    return int(np.random.SeedSequence([seed, shard_idx]).generate_state(1)[0])
+
+
+def generate_shard(shard_idx, n_steps, seed, outdir, policy, env_kwargs):
+    """Simulate `n_steps` interactions with the behaviour `policy` and save them
+    to `<outdir>/shard-<shard_idx>`.
+
+    The environment is built with `seed` so every shard shares the same
+    question bank, each shard then draws its own population of students and
+    runs the rollout from the shard's own seed.
+    """
+    env = StudentEnv(seed=seed, **env_kwargs)
+    np.random.seed(shard_seed(seed, shard_idx))
+    env.load(filename=False)  # New students for this shard
+    agent = behaviour_policies[policy](env.n_concepts)
+
+    def first_action():
+        """Ask the behaviour policy for the first action of an episode."""
+        obs = env.reset()
+        info = env.make_info(env.students[env.s])
+        return agent(obs, 0, False, [info])
+
+    data = {name: np.zeros(n_steps, dtype=dtype) for name, dtype in fields.items()}
+
+    action = first_action()
+    for t in range(n_steps):
+        data["student_idx"][t] = env.s
+        data["question_idx"][t] = env.q
+        data["question_concept"][t] = env.questions[env.q].concepts[0]
+
+        obs, reward, done, info = env.step(action)
+        data["action"][t] = env.flat_action(action)
+        data["correct"][t] = info["correct"]
+        data["p_correct"][t] = info["p_correct"]
+        data["done"][t] = done
+
+        if done:
+            action = first_action()
+        else:
+            action = agent(obs, reward, done, [info])
+
+    shard_dir = os.path.join(outdir, "shard-{:05d}".format(shard_idx))
+    os.makedirs(shard_dir, exist_ok=True)
+    for name, array in data.items():
+        np.save(os.path.join(shard_dir, name + ".npy"), array)
+    return shard_dir
+
+
+def generate(outdir, n_shards, steps_per_shard, seed, policy, n_workers, **env_kwargs):
+    """Generate `n_shards` shards of `steps_per_shard` interactions each across
+    `n_workers` processes.
+    """
+    os.makedirs(outdir, exist_ok=True)
+    manifest = {
+        "n_shards": n_shards,
+        "steps_per_shard": steps_per_shard,
+        "seed": seed,
+        "policy": policy,
+        "env_kwargs": env_kwargs,
+        "fields": {name: np.dtype(dtype).str for name, dtype in fields.items()},
+    }
+    with open(os.path.join(outdir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    jobs = [
+        (i, steps_per_shard, seed, outdir, policy, env_kwargs) for i in range(n_shards)
+    ]
+    with Pool(n_workers) as pool:
+        return pool.starmap(generate_shard, jobs)
+
+
+def load_shards(outdir):
+    """Memory-map every shard in `outdir`.
+
+    Return shards: a list with one dict per shard mapping field name to a
+        read-only memory-mapped array (no data is copied until it is read).
+    """
+    with open(os.path.join(outdir, "manifest.json")) as f:
+        manifest = json.load(f)
+
+    shards = []
+    for i in range(manifest["n_shards"]):
+        shard_dir = os.path.join(outdir, "shard-{:05d}".format(i))
+        shards.append(
+            {
+                name: np.load(os.path.join(shard_dir, name + ".npy"), mmap_mode="r")
+                for name in manifest["fields"]
+            }
+        )
+    return shards
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-od", "--outdir", type=str, default="data/offline")
+    parser.add_argument("-n", "--n-shards", type=int, default=8)
+    parser.add_argument("-ss", "--steps-per-shard", type=str, default="1e5")
+    parser.add_argument("-sd", "--seed", type=int, default=9)
+    parser.add_argument(
+        "-p", "--policy", choices=sorted(behaviour_policies), default="random"
+    )
+    parser.add_argument("-w", "--n-workers", type=int, default=os.cpu_count())
+    parser.add_argument("--n-students", type=int, default=20)
+    parser.add_argument("--n-concepts", type=int, default=5)
+    parser.add_argument("--n-questions", type=int, default=500)
+    args = parser.parse_args()
+
+    shard_dirs = generate(
+        outdir=args.outdir,
+        n_shards=args.n_shards,
+        steps_per_shard=int(float(args.steps_per_shard)),
+        seed=args.seed,
+        policy=args.policy,
+        n_workers=args.n_workers,
+        n_students=args.n_students,
+        n_concepts=args.n_concepts,
+        n_questions=args.n_questions,
+    )
+    print(f"Saved {len(shard_dirs)} shards to {args.outdir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import numpy as np
+
+
+class RolloutBuffer(object):
+    """Preallocated arrays for a batch of PPO experience.
+
+    The environments write observations straight into `obs` (see
+    `StudentEnv.step_into`) so collecting a batch doesn't build any per-step
+    Python lists, copies or info dicts. Arrays are laid out (n_steps, n_envs)
+    and `dones[t]` is True if step t is the first step of an episode, which is
+    the same convention as the PPO2 runner in stable_baselines.
+
+        n_steps: number of steps collected per environment per batch
+        n_envs: number of environments
+        obs_shape: shape of a single observation
+        obs_dtype: dtype of the observations
+        action_shape: shape of a single action, eg. (2,) for factored actions
+    """
+
+    def __init__(
+        self, n_steps, n_envs, obs_shape, obs_dtype=np.float32, action_shape=()
+    ):
+        self.n_steps = n_steps
+        self.n_envs = n_envs
+
+        self.obs = np.zeros((n_steps, n_envs) + tuple(obs_shape), dtype=obs_dtype)
+        self.actions = np.zeros(
+            (n_steps, n_envs) + tuple(action_shape), dtype=np.int64
+        )
+        self.rewards = np.zeros((n_steps, n_envs), dtype=np.float32)
+        self.dones = np.zeros((n_steps, n_envs), dtype=np.bool_)
+        self.values = np.zeros((n_steps, n_envs), dtype=np.float32)
+        self.neglogpacs = np.zeros((n_steps, n_envs), dtype=np.float32)
+        self.advantages = np.zeros((n_steps, n_envs), dtype=np.float32)
+        self.returns = np.zeros((n_steps, n_envs), dtype=np.float32)
+
+        # Observation and done flag to start the next batch from
+        self.next_obs = np.zeros((n_envs,) + tuple(obs_shape), dtype=obs_dtype)
+        self.next_dones = np.zeros(n_envs, dtype=np.bool_)
+
+        # Running return of the current episode of each environment
+        self.episode_rewards = np.zeros(n_envs)
+        self.episode_lengths = np.zeros(n_envs, dtype=np.int64)
+
+    def flatten(self, array):
+        """Return `array` as (n_envs * n_steps, ...) ordered by environment,
+        the layout the PPO2 train step expects.
+        """
+        return array.swapaxes(0, 1).reshape((-1,) + array.shape[2:])
+
+
+def collect(envs, step_fn, buffer):
+    """Fill `buffer` with `buffer.n_steps` steps of every environment.
+
+        envs: list of `StudentEnv`s, one per buffer column
+        step_fn: policy step, takes a batch of observations and returns
+            (actions, values, states, neglogpacs) like `PPO2.step`
+        buffer: a `RolloutBuffer`, `next_obs` must hold the current observations
+
+    Return episodes: a list of (return, length) of the episodes that finished
+    """
+    episodes = []
+    for t in range(buffer.n_steps):
+        buffer.obs[t] = buffer.next_obs
+        buffer.dones[t] = buffer.next_dones
+        actions, values, _, neglogpacs = step_fn(buffer.obs[t])
+        buffer.actions[t] = actions
+        buffer.values[t] = values
+        buffer.neglogpacs[t] = neglogpacs
+
+        for e, env in enumerate(envs):
+            reward, done = env.step_into(actions[e], buffer.next_obs[e])
+            buffer.rewards[t, e] = reward
+            buffer.next_dones[e] = done
+            if done:
+                env.reset()
+                env.observe(out=buffer.next_obs[e])
+
+        buffer.episode_rewards += buffer.rewards[t]
+        buffer.episode_lengths += 1
+        for e in np.nonzero(buffer.next_dones)[0]:
+            episodes.append((buffer.episode_rewards[e], buffer.episode_lengths[e]))
+            buffer.episode_rewards[e] = 0
+            buffer.episode_lengths[e] = 0
+
+    return episodes
+
+
+def compute_gae(buffer, last_values, gamma=0.99, lam=0.95):
+    """Compute the GAE(lambda) advantages and returns of a full buffer in place.
+
+    The recursion runs backwards over time but every step is vectorized over
+    the environments:
+        δ_t = r_t + γ V(s_{t+1}) (1 - done_{t+1}) - V(s_t)
+        A_t = δ_t + γ λ (1 - done_{t+1}) A_{t+1}
+
+        last_values: value estimates of `buffer.next_obs`
+    """
+    not_done = 1.0 - np.concatenate(
+        [buffer.dones[1:], buffer.next_dones[None]], axis=0
+    ).astype(np.float32)
+    next_values = np.concatenate([buffer.values[1:], last_values[None]], axis=0)
+    deltas = buffer.rewards + gamma * next_values * not_done - buffer.values
+
+    last_gae = np.zeros(buffer.n_envs, dtype=np.float32)
+    for t in reversed(range(buffer.n_steps)):
+        last_gae = deltas[t] + gamma * lam * not_done[t] * last_gae
+        buffer.advantages[t] = last_gae
+    buffer.returns[:] = buffer.advantages + buffer.values
+    return buffer.advantages, buffer.returns
@@ -0,0 +1,76 @@
+import numpy as np
+
+
+class SkillHeap(object):
+    """Indexed binary min-heap over a student's skill vector.
+
+    Keeps the position of every concept inside the heap so a single skill can
+    be changed in O(log n) and the weakest skill read in O(1), instead of
+    running `np.argmin` over every concept after each example.
+
+        skills: initial skill vector (one key per concept)
+    """
+
+    def __init__(self, skills):
+        n = len(skills)
+        self.keys = np.array(skills, dtype=np.float64)  # Key of each concept
+        self.heap = np.arange(n)  # heap[i] = concept stored at heap slot i
+        self.pos = np.arange(n)  # pos[c] = heap slot of concept c
+
+        # Heapify bottom up
+        for i in range(n // 2 - 1, -1, -1):
+            self._sift_down(i)
+
+    def __len__(self):
+        return len(self.heap)
+
+    def argmin(self):
+        """Return the index of the weakest skill."""
+        return int(self.heap[0])
+
+    def min(self):
+        """Return the value of the weakest skill."""
+        return self.keys[self.heap[0]]
+
+    def update(self, concept_idx, value):
+        """Set the key of `concept_idx` to `value` and restore the heap."""
+        old = self.keys[concept_idx]
+        self.keys[concept_idx] = value
+        i = self.pos[concept_idx]
+        if value < old:
+            self._sift_up(i)
+        elif value > old:
+            self._sift_down(i)
+
+    def _swap(self, i, j):
+        heap, pos = self.heap, self.pos
+        heap[i], heap[j] = heap[j], heap[i]
+        pos[heap[i]] = i
+        pos[heap[j]] = j
+
+    def _sift_up(self, i):
+        heap, keys = self.heap, self.keys
+        while i > 0:
+            parent = (i - 1) // 2
+            if keys[heap[i]] < keys[heap[parent]]:
+                self._swap(i, parent)
+                i = parent
+            else:
+                break
+
+    def _sift_down(self, i):
+        heap, keys = self.heap, self.keys
+        n = len(heap)
+        while True:
+            left = 2 * i + 1
+            if left >= n:
+                break
+            smallest = left
+            right = left + 1
+            if right < n and keys[heap[right]] < keys[heap[left]]:
+                smallest = right
+            if keys[heap[smallest]] < keys[heap[i]]:
+                self._swap(i, smallest)
+                i = smallest
+            else:
+                break
@@ -61,17 +61,60 @@ def n_concept_irt(thetas, a=1, b=0, c=0.25):
         return one_concept_irt(theta=weakest_skill, a=a, b=b, c=c)
 
 
-def exponential_forgetting_curve(x):
-    raise NotImplementedError
+def exponential_forgetting_curve(gain, dt, strength=500.0):
+    """Ebbinghaus exponential forgetting curve.
 
+        gain: skill gained over the student's initial skill level
+        dt: number of steps since the skill was last used
+        strength: memory strength (steps for the gain to decay by 1/e)
 
-def half_life_regression(x):
-    raise NotImplementedError
+    Return:
+        gain: the remaining gain after dt steps
+    """
+    return gain * np.exp(-dt / strength)
+
+
+def half_life_regression(gain, dt, half_life=250.0):
+    """Half-life regression forgetting (Settles & Meeder 2016), with a fixed
+    half-life instead of one regressed from the student's practice history.
+
+        gain: skill gained over the student's initial skill level
+        dt: number of steps since the skill was last used
+        half_life: steps for the gain to decay by half
+
+    Return:
+        gain: the remaining gain after dt steps
+    """
+    return gain * 2.0 ** (-dt / half_life)
 
 
-def generalized_power_law(x):
-    raise NotImplementedError
+def generalized_power_law(gain, dt, scale=50.0, decay=0.5):
+    """Power law forgetting, forgets quickly at first then slower than the
+    exponential curve.
 
+        gain: skill gained over the student's initial skill level
+        dt: number of steps since the skill was last used
+        scale: steps before the power law decay kicks in
+        decay: exponent of the power law
 
-def weiner_process(x):
-    raise NotImplementedError
+    Return:
+        gain: the remaining gain after dt steps
+    """
+    return gain * (1 + dt / scale) ** (-decay)
+
+
+def weiner_process(gain, dt, sigma=0.01, noise=None):
+    """Skill does a random walk (Wiener process) while it isn't used. The
+    increments are independent so dt steps can be sampled at once.
+
+        gain: skill gained over the student's initial skill level
+        dt: number of steps since the skill was last used
+        sigma: standard deviation of the walk per step
+        noise: standard normal sample(s) to use, if None new ones are drawn
+
+    Return:
+        gain: the gain after dt steps
+    """
+    if noise is None:
+        noise = np.random.randn(*np.shape(gain))
+    return gain + sigma * np.sqrt(dt) * noise
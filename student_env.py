@@ -1,4 +1,4 @@
-from student_simulator import Student
+from student_simulator import Student, one_concept_irt
 from gym.utils import seeding
 from copy import deepcopy
 from gym import spaces
@@ -24,6 +24,17 @@ class StudentEnv(gym.Env):
         n_students=20,
         n_concepts=5,
         n_questions=500,
+        max_prereqs=0,
+        track_weakest=False,
+        forgetting=None,
+        observation="index",
+        history_len=16,
+        question_order="fixed",
+        session_length=None,
+        max_session_length=None,
+        one_student=False,
+        reward="sample",
+        factored_actions=False,
         seed=9,
     ):
         """Create the student environment
@@ -35,21 +46,104 @@ class StudentEnv(gym.Env):
             n_students: # of students
             n_concepts: # of concepts
             n_questions: # of questions
+            max_prereqs: max # of prerequisites per concept. If 0: concepts
+                are independent, otherwise a sparse prerequisite graph is
+                generated (see `generate.prerequisites`)
+            track_weakest: have each student keep a heap of their skills so
+                the weakest skill is available in O(log n) (use for curricula
+                with thousands of concepts)
+            forgetting: None or the name of a forgetting model in
+                `student_simulator.forgetting_models`. Decay is applied lazily
+                when a student's skill is read, not on every step (the
+                "student_skills" info has decay applied). Can't be used with
+                `track_weakest`.
+            observation: "index" to observe [student_idx, question_idx], or
+                "history" to observe the student's last `history_len`
+                (action, question concept, correct) tuples, oldest first.
+                Padded with -1 until the student has answered enough questions
+            history_len: length of the history window
+            question_order: "fixed" to ask each student the questions in
+                order, or "random" to ask them in a new random order every
+                session
+            session_length: # of questions asked per session. Either None
+                (every student answers all `n_questions`), an int, a sequence
+                with the length of each session, or a sampler f(n_sessions)
+                that returns the length of every session and is called at
+                each reset for variable length sessions
+            max_session_length: upper bound of the lengths a `session_length`
+                sampler returns (default `n_questions`), the schedules are
+                preallocated to fit it
+            one_student: if True an episode is a single session of a random
+                student from the population, otherwise every student has a
+                session each episode
+            reward: "sample" for a reward of 1 if the student's sampled answer
+                is correct, "expected" for the probability of answering
+                correctly, or "bank_gain" for the increase in the expected
+                number of correct answers over the whole question bank from
+                the example. The expected rewards have far lower variance.
+            factored_actions: if True the action space is MultiDiscrete
+                [n_concepts, 4] (concept, learning style) instead of one
+                Discrete(4 * n_concepts) action, so a policy has n_concepts + 4
+                outputs rather than 4 * n_concepts. Both forms of action are
+                accepted by `step` either way.
             seed: global seed
+
+        The student and question of every step are precomputed into index
+        schedules at reset, so `step` only does a lookup. Stepping after the
+        episode is done raises RuntimeError, call `reset` first.
         """
         np.random.seed(seed)
 
-        self.observation_space = spaces.MultiDiscrete([n_students, n_questions])
-        self.action_space = spaces.Discrete(4 * n_concepts)
+        if observation == "index":
+            self.observation_space = spaces.MultiDiscrete([n_students, n_questions])
+        elif observation == "history":
+            self.observation_space = spaces.Box(
+                low=-1,
+                high=4 * n_concepts,
+                shape=(history_len, 3),
+                dtype=np.float32,
+            )
+        else:
+            raise ValueError(f"Unknown observation mode: {observation}")
+        if factored_actions:
+            self.action_space = spaces.MultiDiscrete([n_concepts, 4])
+        else:
+            self.action_space = spaces.Discrete(4 * n_concepts)
 
         self.n_students = n_students
         self.n_concepts = n_concepts
         self.n_lstyles = 4  # VARK learning styles
         self.n_questions = n_questions
+        self.track_weakest = track_weakest
+        self.forgetting = forgetting
+        self.observation = observation
+        self.history_len = history_len
+        self.question_order = question_order
+        self.one_student = one_student
+        if reward not in ("sample", "expected", "bank_gain"):
+            raise ValueError(f"Unknown reward: {reward}")
+        self.reward = reward
+        self.session_length = session_length
+        self.n_sessions = 1 if one_student else n_students
+        if callable(session_length):
+            self.max_session_length = max_session_length or n_questions
+        else:
+            self.session_lengths = np.zeros(self.n_sessions, dtype=np.int64)
+            self.session_lengths[:] = (
+                n_questions if session_length is None else session_length
+            )
+            if np.any(self.session_lengths < 1):
+                raise ValueError(f"Session lengths must be positive: {session_length}")
+            self.max_session_length = self.session_lengths.max()
         self.i = 0  # Current step
         self.s = 0  # Current student
         self.q = 0  # Current question
-        self.max_steps = self.n_students * self.n_questions
+
+        # Sparse prerequisite graph between concepts (CSR form)
+        if max_prereqs > 0:
+            self.prerequisites = generate.prerequisites(n_concepts, max_prereqs)
+        else:
+            self.prerequisites = None
 
         # Handle loading and saving to/from an initial state
         self.load(filename=load)
@@ -62,6 +156,74 @@ class StudentEnv(gym.Env):
             n_questions, n_concepts, max_concepts=1, difficulty_fn=np.random.randn
         )
 
+        # The question bank grouped by concept (CSR form) for vectorized rewards
+        question_concepts = np.array([q.concepts[0] for q in self.questions])
+        difficulty = np.array([q.difficulty for q in self.questions])
+        order = np.argsort(question_concepts, kind="stable")
+        self.concept_questions = question_concepts[order]
+        self.concept_difficulty = difficulty[order]
+        self.concept_qptr = np.zeros(n_concepts + 1, dtype=np.int64)
+        self.concept_qptr[1:] = np.cumsum(
+            np.bincount(question_concepts, minlength=n_concepts)
+        )
+
+        # Ring buffer of each student's (action, concept, correct) history
+        if observation == "history":
+            self.history = np.full(
+                (n_students, history_len, 3), -1, dtype=np.float32
+            )
+            self.history_pos = np.zeros(n_students, dtype=np.int64)
+            # Row p gives the buffer order (oldest first) when the next write is p
+            self.history_order = (
+                np.arange(history_len)[:, None] + np.arange(history_len)[None, :]
+            ) % history_len
+
+        # Student and question of every step in the episode, sized for the
+        # longest possible episode plus one step so the index after the last
+        # step is valid (it wraps to the first step)
+        if question_order not in ("fixed", "random"):
+            raise ValueError(f"Unknown question order: {question_order}")
+        capacity = self.n_sessions * self.max_session_length + 1
+        self.student_schedule = np.zeros(capacity, dtype=np.int64)
+        self.question_schedule = np.zeros(capacity, dtype=np.int64)
+        self.new_session = np.zeros(capacity, dtype=np.bool_)
+        self.schedule()
+        self.s = self.student_schedule[0]
+        self.q = self.question_schedule[0]
+
+    def schedule(self):
+        """Fill in the index schedules for a new episode."""
+        if callable(self.session_length):
+            lengths = self.session_length(self.n_sessions)
+            lengths = np.asarray(lengths, dtype=np.int64)
+            self.session_lengths = np.clip(lengths, 1, self.max_session_length)
+        lengths = self.session_lengths
+        self.max_steps = n = lengths.sum()
+
+        if self.one_student:
+            students = np.array([np.random.choice(self.n_students)])
+        else:
+            students = np.arange(self.n_students)
+        session = np.repeat(np.arange(self.n_sessions), lengths)
+        session_step = np.arange(n) - (np.cumsum(lengths) - lengths)[session]
+
+        self.student_schedule[:n] = students[session]
+        self.new_session[:n] = session_step == 0
+        if self.question_order == "fixed":
+            self.question_schedule[:n] = session_step % self.n_questions
+        else:
+            # A random permutation of the questions for each session
+            n_repeats = int(np.ceil(self.max_session_length / self.n_questions))
+            perms = np.argsort(
+                np.random.rand(self.n_sessions, n_repeats, self.n_questions), axis=2
+            )
+            perms = perms.reshape(self.n_sessions, -1)
+            self.question_schedule[:n] = perms[session, session_step]
+
+        self.student_schedule[n] = self.student_schedule[0]
+        self.question_schedule[n] = self.question_schedule[0]
+        self.new_session[n] = True
+
     def load(self, filename, seed=None):
         if seed is None:
             seed = np.random.randint(1000)
@@ -74,7 +236,13 @@ class StudentEnv(gym.Env):
             )
         else:
             self.students_init = [
-                Student(self.n_concepts) for i in range(self.n_students)
+                Student(
+                    self.n_concepts,
+                    prerequisites=self.prerequisites,
+                    track_weakest=self.track_weakest,
+                    forgetting=self.forgetting,
+                )
+                for i in range(self.n_students)
             ]
 
     def save(self, filename, seed=None):
@@ -95,56 +263,151 @@ class StudentEnv(gym.Env):
         print(f"Saving to {filename}")
 
     def reset(self, shuffle_students=False):
+        self.schedule()
         self.i = 0  # Current step
-        self.s = 0  # Current student
-        self.q = 0  # Current question
-        self.students = deepcopy(self.students_init)
+        self.s = self.student_schedule[0]  # Current student
+        self.q = self.question_schedule[0]  # Current question
+        if self.one_student:
+            # Only the drawn student is taught, the rest can stay shared
+            self.students = list(self.students_init)
+            self.students[self.s] = deepcopy(self.students_init[self.s])
+        else:
+            self.students = deepcopy(self.students_init)
         if shuffle_students:  # Does it make sense to ever shuffle the students?
             self.students = list(np.random.shuffle(self.students))
+        if self.observation == "history":
+            if self.one_student:
+                self.history[self.s].fill(-1)
+                self.history_pos[self.s] = 0
+            else:
+                self.history.fill(-1)
+                self.history_pos.fill(0)
+            return self.observe()
         return 0  # Default state
 
+    def observe(self, out=None):
+        """Return the observation for the current student and question. If
+        `out` is given the observation is written into it instead of a new array.
+        """
+        if self.observation == "history":
+            order = self.history_order[self.history_pos[self.s]]
+            return np.take(self.history[self.s], order, axis=0, out=out)
+        # State is the student and question being asked
+        if out is None:
+            return np.array([self.s, self.q])
+        out[0], out[1] = self.s, self.q
+        return out
+
+    def flat_action(self, action):
+        """Return `action` as a single index concept * 4 + learning style.
+
+            action: a flat index, [flat index], or (concept, learning style)
+        """
+        action = np.reshape(action, -1)
+        if len(action) == 2:
+            return int(action[0]) * self.n_lstyles + int(action[1])
+        return int(action[0])
+
     def step(self, action):
-        if isinstance(action, (np.ndarray, list)):
-            action = action[0]
+        action = self.flat_action(action)
+        reward, done, student, correct, p_correct = self._transition(action)
+        info = self.make_info(student, correct, p_correct)
+
+        # What is the state? -> The knowledge space of each student
+        # What should the obersvation be? Whether the student answered the
+        #    current question correctly or not (so same as reward I guess??).
+        #    To use the obs, you need to use an RNN (or observation="history").
+        state = self.observe()
+
+        return state, reward, done, info
+
+    def make_info(self, student, correct=None, p_correct=None):
+        """Return the info dict for the current step, with the true knowledge
+        state of `student` (the student who just answered, or the current
+        student before the first step of an episode).
+        """
+        info = {
+            "student_idx": self.s,
+            "question_idx": self.q,
+            "new_session": self.new_session[self.i],
+            "student_skills": student.current_skills(),
+            "student_learner_style": student.learner_style,
+            "correct": correct,
+            "p_correct": p_correct,
+        }
+        if self.track_weakest:
+            info["student_weakest_skill"] = student.weakest_skill()
+        return info
+
+    def step_into(self, action, obs_out):
+        """Take a step without building the info dict, writing the next
+        observation into `obs_out` (eg. a row of a rollout buffer).
+
+        Return (reward, done)
+        """
+        reward, done = self._transition(self.flat_action(action))[:2]
+        self.observe(out=obs_out)
+        return reward, done
+
+    def bank_p_correct(self, student, concept_idx):
+        """Return the probability `student` answers each question of the bank
+        correctly, for the questions an example on `concept_idx` can change.
+
+        Without forgetting an example only changes the skill of its concept, so
+        only that concept's questions are evaluated. With forgetting every
+        other skill decays during the step too, so the whole bank is.
+        """
+        if self.forgetting is None:
+            lo, hi = self.concept_qptr[concept_idx], self.concept_qptr[concept_idx + 1]
+            difficulty = self.concept_difficulty[lo:hi]
+            return one_concept_irt(student.skill(concept_idx), b=difficulty)
+        skills = student.current_skills()[self.concept_questions]
+        return one_concept_irt(skills, b=self.concept_difficulty)
+
+    def _transition(self, action):
+        """Teach the current student and ask them the current question, then
+        move on to the next step of the schedule.
+
+        Return (reward, done, student, correct, p_correct)
+        """
+        if self.i >= self.max_steps:
+            raise RuntimeError("Episode is done, call reset() before stepping")
         student = self.students[self.s]
         question = self.questions[self.q]
         concept_idx = int(action / self.n_lstyles)
         learning_style_idx = action % self.n_lstyles
         ex = (concept_idx, learning_style_idx)
 
+        if self.reward == "bank_gain":
+            p_before = self.bank_p_correct(student, concept_idx)
+
         # Show the student the next example
         student.example(ex)
 
         # Ask the student the next question
         correct, p_correct = student.question(question)
-        reward = int(correct)  # Reward of 1 if correct answer
-
-        # Increment steps, the question, and the possibly the student
-        self.i += 1
-        self.q = (self.q + 1) % self.n_questions
-        if self.i % self.n_questions == 0:  # Next student once student completes all qs
-            self.s = (self.s + 1) % self.n_students
+        if self.reward == "sample":
+            reward = int(correct)  # Reward of 1 if correct answer
+        elif self.reward == "expected":
+            reward = p_correct
+        else:
+            p_after = self.bank_p_correct(student, concept_idx)
+            reward = np.sum(p_after - p_before)
 
-        # Done episode if all students have been shown all questions
-        done = self.i >= self.max_steps - 1
+        if self.observation == "history":
+            pos = self.history_pos[self.s]
+            self.history[self.s, pos] = (action, question.concepts[0], correct)
+            self.history_pos[self.s] = (pos + 1) % self.history_len
 
-        # Give the true knowledge state of the student
-        info = {
-            "student_idx": self.s,
-            "question_idx": self.q,
-            "student_skills": student.skills,
-            "student_learner_style": student.learner_style,
-        }
-
-        # What is the state? -> The knowledge space of each student
-        # What should the obersvation be? Whether the student answered the
-        #    current question correctly or not (so same as reward I guess??).
-        #    To use the obs, you need to use an RNN.
+        # Increment steps, and look up the next student and question
+        self.i += 1
+        self.s = self.student_schedule[self.i]
+        self.q = self.question_schedule[self.i]
 
-        # State is the student and question being asked
-        state = np.array([self.s, self.q])
+        # Done episode if all sessions have been completed
+        done = self.i >= self.max_steps
 
-        return state, reward, done, info
+        return reward, done, student, correct, p_correct
 
     def render(self, mode="human"):
         pass
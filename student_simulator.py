@@ -1,6 +1,9 @@
+import inspect
+
 import numpy as np
 
 from generate import learner_style, learner_skills
+from skill_heap import SkillHeap
 
 
 # ==============================================================================
@@ -37,11 +40,50 @@ def one_concept_irt(theta, a=1, b=0, c=0.25):
 
 irt = one_concept_irt
 
+
+def exponential_forgetting_curve(gain, dt, strength=500.0):
+    """Ebbinghaus exponential forgetting curve (see statistics.py)."""
+    return gain * np.exp(-dt / strength)
+
+
+def half_life_regression(gain, dt, half_life=250.0):
+    """Half-life regression forgetting (see statistics.py)."""
+    return gain * 2.0 ** (-dt / half_life)
+
+
+def generalized_power_law(gain, dt, scale=50.0, decay=0.5):
+    """Power law forgetting (see statistics.py)."""
+    return gain * (1 + dt / scale) ** (-decay)
+
+
+def weiner_process(gain, dt, sigma=0.01, noise=None):
+    """Random walk of the skill while it isn't used (see statistics.py)."""
+    if noise is None:
+        noise = np.random.randn(*np.shape(gain))
+    return gain + sigma * np.sqrt(dt) * noise
+
+
+forgetting_models = {
+    "exponential": exponential_forgetting_curve,
+    "half_life": half_life_regression,
+    "power_law": generalized_power_law,
+    "weiner": weiner_process,
+}
+
 # ==========================================================================
 
 
 class Student(object):
-    def __init__(self, n_concepts, avg_skill_fn=lambda: np.random.randn() - 3.0):
+    def __init__(
+        self,
+        n_concepts,
+        avg_skill_fn=lambda: np.random.randn() - 3.0,
+        prerequisites=None,
+        prereq_threshold=-3.0,
+        prereq_penalty=0.5,
+        track_weakest=False,
+        forgetting=None,
+    ):
         """
         avg_skill_fn: 
         If you have: avg_skill_fn=lambda: np.random.randn() - 3.0
@@ -56,12 +98,69 @@ class Student(object):
         prob correct answer like:
             [0.289, 0.291, 0.308, 0.301, 0.381]
 
+        prerequisites: optional sparse prerequisite graph (indptr, indices) as
+            returned by `generate.prerequisites`. Examples on a concept whose
+            weakest prerequisite is below `prereq_threshold` only give
+            `prereq_penalty` of the usual skill increase.
+        track_weakest: keep a `SkillHeap` of the skills so the weakest skill
+            can be found in O(log n) after each example (for large curricula)
+        forgetting: None, a name in `forgetting_models`, or a function
+            f(gain, dt) -> gain. Decays the skill gained over the initial skill
+            level with the steps since the last example on that concept. If f
+            takes a `noise` argument it is given a standard normal sample that
+            is fixed between examples, so stochastic models read consistently.
+
+        Forgetting is evaluated lazily: `self.skills` holds each skill as of
+        the last example on it, with the step of that example in
+        `self.last_touched`, and decay is only computed when a skill is read
+        (see `skill`). Reading never changes the student. Forgetting can't be
+        combined with `track_weakest` since decay would leave the heap stale.
         """
         self.learner_style = learner_style()
         self.avg_skill = avg_skill_fn()
         self.n_concepts = n_concepts
+        self.prerequisites = prerequisites
+        self.prereq_threshold = prereq_threshold
+        self.prereq_penalty = prereq_penalty
+
+        if track_weakest and forgetting is not None:
+            raise ValueError("track_weakest can't be used with forgetting")
 
         self.skills = learner_skills(n_concepts, self.avg_skill, specific_skill_fn)
+        self.skill_heap = SkillHeap(self.skills) if track_weakest else None
+
+        if isinstance(forgetting, str):
+            forgetting = forgetting_models[forgetting]
+        self.forgetting = forgetting
+        self.forgetting_noise = None
+        if forgetting is not None:
+            self.t = 0  # Number of examples seen (the student's clock)
+            self.last_touched = np.zeros(n_concepts, dtype=np.int64)
+            self.init_skills = self.skills.copy()  # Skills decay towards these
+            if "noise" in inspect.signature(forgetting).parameters:
+                self.forgetting_noise = np.random.randn(n_concepts)
+
+    def skill(self, concept_idx):
+        """Return the current skill(s) of `concept_idx` (an index or array of
+        indices), applying any forgetting since their last example. Doesn't
+        modify the student, so reading as often as you like is safe.
+        """
+        if self.forgetting is None:
+            return self.skills[concept_idx]
+
+        dt = self.t - self.last_touched[concept_idx]
+        base = self.init_skills[concept_idx]
+        gain = self.skills[concept_idx] - base
+        if self.forgetting_noise is None:
+            return base + self.forgetting(gain, dt)
+        noise = self.forgetting_noise[concept_idx]
+        return base + self.forgetting(gain, dt, noise=noise)
+
+    def current_skills(self):
+        """Return all skills with forgetting applied."""
+        if self.forgetting is None:
+            return self.skills
+        return self.skill(np.arange(self.n_concepts))
 
     def question(self, question, a=1, c=0.25):
         """Take a question and return the probability that the student answers
@@ -93,7 +192,7 @@ class Student(object):
 
         if len(concepts) == 1:
             concept_idx = concepts[0]
-            concept_skill = self.skills[concept_idx]
+            concept_skill = self.skill(concept_idx)
             p_correct = one_concept_irt(concept_skill, b=difficulty)
         else:
             raise ValueError("There must be only one concept for each question")
@@ -107,6 +206,31 @@ class Student(object):
         between the example learning style and student learning style.
              
             example: a tuple of concept index and learning style index
+
+        Only the skill of the example's concept (and its entry in the skill
+        heap) is touched, so the cost doesn't grow with the number of concepts.
         """
         concept_idx, ls_idx = example
-        self.skills[concept_idx] += delta_scale * self.learner_style[ls_idx]
+        delta = delta_scale * self.learner_style[ls_idx]
+        if self.forgetting is not None:
+            self.t += 1
+
+        if self.prerequisites is not None:
+            indptr, indices = self.prerequisites
+            prereqs = indices[indptr[concept_idx] : indptr[concept_idx + 1]]
+            if len(prereqs) and self.skill(prereqs).min() < self.prereq_threshold:
+                delta *= self.prereq_penalty
+
+        self.skills[concept_idx] = self.skill(concept_idx) + delta
+        if self.forgetting is not None:
+            self.last_touched[concept_idx] = self.t
+            if self.forgetting_noise is not None:
+                self.forgetting_noise[concept_idx] = np.random.randn()
+        if self.skill_heap is not None:
+            self.skill_heap.update(concept_idx, self.skills[concept_idx])
+
+    def weakest_skill(self):
+        """Return the index of the student's weakest skill."""
+        if self.skill_heap is not None:
+            return self.skill_heap.argmin()
+        return int(np.argmin(self.current_skills()))
@@ -0,0 +1,74 @@
+import threading
+import time
+import csv
+
+import numpy as np
+import pytest
+
+import launch
+
+
+def write_run(run_dir, rewards, fps):
+    run_dir.mkdir(parents=True)
+    with open(run_dir / "monitor.csv", "w") as f:
+        f.write('#{"t_start": 0.0, "env_id": null}\nr,l,t\n')
+        for i, r in enumerate(rewards):
+            f.write(f"{r},10,{i}\n")
+    with open(run_dir / "progress.csv", "w") as f:
+        f.write("fps,total_timesteps\n")
+        for i, value in enumerate(fps):
+            f.write(f"{value},{i}\n")
+
+
+def test_summarize(tmp_path):
+    write_run(tmp_path / "1e3" / "seed-1", [1.0, 2.0, 3.0], [100, 300])
+    write_run(tmp_path / "1e3" / "seed-2", [5.0, 7.0], [400])
+    launch.summarize([1, 2, 3], "1e3", str(tmp_path), {1: 0, 2: 0, 3: 1})
+
+    with open(tmp_path / "1e3" / "summary.csv") as f:
+        rows = {row["seed"]: row for row in csv.DictReader(f)}
+    assert [rows[s]["returncode"] for s in "123"] == ["0", "0", "1"]
+    assert [float(rows[s]["episodes"]) for s in "123"] == [3, 2, 0]
+    assert [float(rows[s]["mean_reward"]) for s in "12"] == [2.0, 6.0]
+    assert [float(rows[s]["last_reward"]) for s in "12"] == [3.0, 7.0]
+    assert [float(rows[s]["mean_fps"]) for s in "12"] == [200.0, 400.0]
+    assert np.isnan(float(rows["3"]["mean_reward"]))  # seed 3 wrote no results
+    assert float(rows["mean"]["mean_reward"]) == 4.0
+
+    episodes = np.genfromtxt(
+        tmp_path / "1e3" / "episode_rewards.csv", delimiter=",", names=True
+    )
+    assert list(episodes["mean"]) == [3.0, 4.5, 3.0]
+    assert list(episodes["n_seeds"]) == [2, 2, 1]
+
+
+def test_launch_core_sets_are_disjoint(monkeypatch):
+    running = []
+    used = []
+    lock = threading.Lock()
+
+    def run_seed(seed, budget, logdir, cores, train_args):
+        # No other running worker may hold any of these cores
+        with lock:
+            overlap = any(cores & other for other in running)
+            running.append(cores)
+            used.append(frozenset(cores))
+        time.sleep(0.01)  # Let the workers overlap in time
+        with lock:
+            running.remove(cores)
+        return 1 if overlap else 0
+
+    monkeypatch.setattr(launch, "available_cpus", lambda: [0, 1, 2, 3, 4])
+    monkeypatch.setattr(launch, "run_seed", run_seed)
+    returncodes = launch.launch(list(range(8)), "1e3", "logs", 2, 2, [])
+
+    assert returncodes == {seed: 0 for seed in range(8)}
+    assert set(used) <= {frozenset({0, 1}), frozenset({2, 3})}
+
+
+def test_launch_rejects_oversubscription_and_duplicates(monkeypatch):
+    monkeypatch.setattr(launch, "available_cpus", lambda: [0, 1, 2, 3])
+    with pytest.raises(ValueError):
+        launch.launch([1, 2, 3], "1e3", "logs", 3, 2, [])
+    with pytest.raises(ValueError):
+        launch.launch([5, 5], "1e3", "logs", 2, 1, [])
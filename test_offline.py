@@ -0,0 +1,25 @@
+import numpy as np
+
+from offline import generate, load_shards
+
+
+def test_shards_independent_of_workers(tmp_path):
+    kwargs = dict(
+        n_shards=3,
+        steps_per_shard=500,
+        seed=9,
+        policy="eps_greedy",
+        n_students=3,
+        n_questions=100,
+    )
+    generate(str(tmp_path / "one"), n_workers=1, **kwargs)
+    generate(str(tmp_path / "two"), n_workers=2, **kwargs)
+
+    one = load_shards(str(tmp_path / "one"))
+    two = load_shards(str(tmp_path / "two"))
+    for shard_one, shard_two in zip(one, two):
+        for name in shard_one:
+            assert np.array_equal(shard_one[name], shard_two[name])
+
+    # Shards have different students, so they don't replay the same answers
+    assert not np.array_equal(one[0]["p_correct"], one[1]["p_correct"])
@@ -0,0 +1,66 @@
+import numpy as np
+
+from rollout import RolloutBuffer, collect, compute_gae
+from student_env import StudentEnv
+
+
+def random_policy(obs):
+    n = len(obs)
+    return np.random.randint(20, size=n), np.random.randn(n), None, np.random.rand(n)
+
+
+def make_buffer(n_steps, n_envs, **env_kwargs):
+    envs = [StudentEnv(**env_kwargs) for _ in range(n_envs)]
+    space = envs[0].observation_space
+    buffer = RolloutBuffer(n_steps, n_envs, space.shape, space.dtype)
+    for e, env in enumerate(envs):
+        env.reset()
+        env.observe(out=buffer.next_obs[e])
+    return envs, buffer
+
+
+def runner_gae(buffer, last_values, gamma, lam):
+    """GAE loop of the stable_baselines PPO2 runner."""
+    advantages = np.zeros_like(buffer.rewards)
+    last_gae_lam = 0
+    for step in reversed(range(buffer.n_steps)):
+        if step == buffer.n_steps - 1:
+            nextnonterminal = 1.0 - buffer.next_dones
+            nextvalues = last_values
+        else:
+            nextnonterminal = 1.0 - buffer.dones[step + 1]
+            nextvalues = buffer.values[step + 1]
+        delta = (
+            buffer.rewards[step]
+            + gamma * nextvalues * nextnonterminal
+            - buffer.values[step]
+        )
+        advantages[step] = last_gae_lam = (
+            delta + gamma * lam * nextnonterminal * last_gae_lam
+        )
+    return advantages
+
+
+def test_compute_gae_matches_ppo2_runner():
+    np.random.seed(0)
+    envs, buffer = make_buffer(512, 3, one_student=True, session_length=37)
+    collect(envs, random_policy, buffer)
+    last_values = np.random.randn(3).astype(np.float32)
+
+    advantages, returns = compute_gae(buffer, last_values, gamma=0.99, lam=0.95)
+    expected = runner_gae(buffer, last_values, gamma=0.99, lam=0.95)
+    assert np.allclose(advantages, expected, atol=1e-5)
+    assert np.allclose(returns, expected + buffer.values, atol=1e-5)
+
+
+def test_dones_mark_episode_starts():
+    np.random.seed(0)
+    envs, buffer = make_buffer(23, 2, one_student=True, session_length=5)
+    episodes = collect(envs, random_policy, buffer)
+
+    # dones[t] is True when the previous step ended an episode
+    t = np.arange(23)
+    expected = (t > 0) & (t % 5 == 0)
+    assert np.array_equal(buffer.dones, np.stack([expected] * 2, axis=1))
+    assert not buffer.next_dones.any()  # 23 isn't a multiple of 5
+    assert [length for _, length in episodes] == [5] * 8
@@ -0,0 +1,16 @@
+import numpy as np
+
+from skill_heap import SkillHeap
+
+
+def test_skill_heap_argmin():
+    skills = np.random.randn(1000)
+    heap = SkillHeap(skills)
+    assert heap.argmin() == np.argmin(skills)
+
+    for _ in range(500):
+        idx = np.random.choice(len(skills))
+        skills[idx] += np.random.randn()
+        heap.update(idx, skills[idx])
+        assert heap.argmin() == np.argmin(skills)
+        assert heap.min() == np.min(skills)
@@ -0,0 +1,147 @@
+import numpy as np
+import pytest
+
+from student_env import StudentEnv
+from student_simulator import one_concept_irt
+
+
+def bank_p_correct(env, student):
+    """Brute force probability of answering every question in the bank."""
+    return np.array(
+        [
+            one_concept_irt(student.skill(q.concepts[0]), b=q.difficulty)
+            for q in env.questions
+        ]
+    )
+
+
+def test_expected_reward_is_p_correct():
+    env = StudentEnv(reward="expected")
+    env.reset()
+    for action in range(20):
+        _, reward, _, info = env.step([action])
+        assert reward == info["p_correct"]
+
+
+@pytest.mark.parametrize("forgetting", [None, "exponential"])
+def test_bank_gain_matches_brute_force(forgetting):
+    env = StudentEnv(reward="bank_gain", forgetting=forgetting)
+    env.reset()
+    for action in [1, 4, 8, 4, 19, 0] * 5:
+        student = env.students[env.s]
+        before = bank_p_correct(env, student)
+        _, reward, _, _ = env.step([action])
+        after = bank_p_correct(env, student)
+        assert reward == pytest.approx(np.sum(after - before))
+
+
+def run_episode(env, action=0):
+    """Step `env` until done, return the infos."""
+    env.reset()
+    infos = []
+    done = False
+    while not done:
+        _, _, done, info = env.step([action])
+        infos.append(info)
+    return infos
+
+
+def test_random_question_order_is_permutation():
+    env = StudentEnv(n_students=4, n_questions=30, question_order="random")
+    for _ in range(2):
+        env.reset()
+        questions = env.question_schedule[: env.max_steps].reshape(4, 30)
+        for session in questions:
+            assert np.array_equal(np.sort(session), np.arange(30))
+
+
+@pytest.mark.parametrize("lengths", [[2, 3, 4], np.array([2, 3, 4])])
+def test_per_session_lengths(lengths):
+    env = StudentEnv(n_students=3, n_questions=7, session_length=lengths)
+    infos = run_episode(env)
+    assert len(infos) == env.max_steps == 9
+    assert np.array_equal(env.student_schedule[:9], [0, 0, 1, 1, 1, 2, 2, 2, 2])
+    assert np.array_equal(env.question_schedule[:9], [0, 1, 0, 1, 2, 0, 1, 2, 3])
+
+
+def test_non_positive_session_length_raises():
+    with pytest.raises(ValueError):
+        StudentEnv(n_students=3, session_length=[2, 0, 4])
+
+
+def test_session_length_sampler():
+    np.random.seed(0)
+    sampler = lambda n: np.random.randint(-5, 30, size=n)
+    env = StudentEnv(n_students=4, session_length=sampler, max_session_length=20)
+    for _ in range(5):
+        infos = run_episode(env)
+        assert np.all((env.session_lengths >= 1) & (env.session_lengths <= 20))
+        assert len(infos) == env.session_lengths.sum()
+
+
+def test_new_session_flags():
+    env = StudentEnv(n_students=3, n_questions=7, session_length=[2, 3, 4])
+    infos = run_episode(env)
+    # info describes the next step, which starts a session after steps 2, 5, 9
+    flags = [info["new_session"] for info in infos]
+    assert flags == [False, True, False, False, True, False, False, False, True]
+
+
+def test_step_after_done_raises():
+    env = StudentEnv(one_student=True, session_length=5)
+    assert len(run_episode(env)) == 5
+    with pytest.raises(RuntimeError):
+        env.step([0])
+
+
+def test_one_student_reset_copies_drawn_student():
+    env = StudentEnv(one_student=True, session_length=5)
+    for _ in range(5):
+        env.reset()
+        drawn = env.s
+        assert env.students[drawn] is not env.students_init[drawn]
+        others = [i for i in range(env.n_students) if i != drawn]
+        assert all(env.students[i] is env.students_init[i] for i in others)
+
+        # Teaching the drawn student doesn't touch the initial population
+        init_skills = env.students_init[drawn].skills.copy()
+        style = np.argmax(env.students[drawn].learner_style)
+        for _ in range(5):
+            env.step([style])
+        assert not np.array_equal(env.students[drawn].skills, init_skills)
+        assert np.array_equal(env.students_init[drawn].skills, init_skills)
+
+
+def test_history_window():
+    env = StudentEnv(
+        n_students=2, n_questions=10, observation="history", history_len=4
+    )
+    obs = env.reset()
+    assert obs.shape == (4, 3) and np.all(obs == -1)
+
+    seen = []
+    for action in range(7):
+        concept = env.questions[env.q].concepts[0]
+        obs, _, _, info = env.step([action])
+        seen.append((action, concept, info["correct"]))
+        # Last 4 tuples oldest first, padded with -1 at the start
+        window = [(-1, -1, -1)] * 4 + seen
+        assert np.array_equal(obs, np.array(window[-4:], dtype=np.float32))
+
+    # Each student has their own window
+    for action in range(7, 10):
+        obs, _, _, info = env.step([action])
+    assert info["student_idx"] == 1
+    assert np.all(obs == -1)
+
+
+def test_history_resets_drawn_student_in_one_student_mode():
+    env = StudentEnv(
+        one_student=True, session_length=6, observation="history", history_len=4
+    )
+    for _ in range(5):
+        obs = env.reset()
+        assert np.all(obs == -1)
+        for action in range(6):
+            obs, _, _, _ = env.step([action])
+        assert np.array_equal(obs[:, 0], [2, 3, 4, 5])
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from student_simulator import Student, forgetting_models
+
+
+def teach(forgetting, read_every_step, seed=0):
+    """Teach concept 0 twenty times then concept 1 two hundred times, return
+    the gain left on concept 0.
+    """
+    np.random.seed(seed)
+    student = Student(2, forgetting=forgetting)
+    student.learner_style[:] = 1.0
+    for _ in range(20):
+        student.example((0, 0))
+    for _ in range(200):
+        student.example((1, 0))
+        if read_every_step:
+            student.skill(0)
+    return student.skill(0) - student.init_skills[0]
+
+
+@pytest.mark.parametrize("forgetting", sorted(forgetting_models))
+def test_reads_dont_change_forgetting(forgetting):
+    gain = teach(forgetting, read_every_step=False)
+    assert gain == pytest.approx(teach(forgetting, read_every_step=True))
+
+
+def test_forgetting_decays_from_last_example():
+    forget = forgetting_models["power_law"]
+    expected = 0.0
+    for _ in range(20):  # One step of forgetting between examples
+        expected = forget(expected, 1) + 0.2
+    expected = forget(expected, 200)
+    assert teach("power_law", read_every_step=False) == pytest.approx(expected)
+
+
+def test_forgetting_with_track_weakest_raises():
+    with pytest.raises(ValueError):
+        Student(5, track_weakest=True, forgetting="exponential")
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("stable_baselines")
+
+from stable_baselines import logger
+from student_env import StudentEnv
+from launch import read_monitor
+import train
+
+
+class StubModel(object):
+    """Just enough of PPO2 for `learn_fast`, with a random policy."""
+
+    n_steps = 64
+    nminibatches = 4
+    noptepochs = 2
+    gamma = 0.99
+    lam = 0.95
+    learning_rate = 3e-4
+    cliprange = 0.2
+    verbose = 1
+    loss_names = ["policy_loss", "value_loss"]
+
+    def __init__(self):
+        self.num_timesteps = 0
+        self.minibatch_sizes = []
+
+    def step(self, obs):
+        n = len(obs)
+        return np.random.randint(20, size=n), np.zeros(n), None, np.zeros(n)
+
+    def value(self, obs):
+        return np.zeros(len(obs))
+
+    def _train_step(self, learning_rate, cliprange, obs, *args, **kwargs):
+        self.minibatch_sizes.append(len(obs))
+        return [0.0, 0.0]
+
+
+def test_learn_fast(tmp_path):
+    logger.configure(str(tmp_path), ["csv"])
+    envs = [StudentEnv(one_student=True, session_length=10) for _ in range(2)]
+    model = train.learn_fast(StubModel(), envs, total_timesteps=3 * 128)
+
+    assert model.num_timesteps == 3 * 128
+    assert model.minibatch_sizes == [32] * (3 * 2 * 4)
+    rewards = read_monitor(str(tmp_path / "monitor.csv"))
+    assert len(rewards) == 2 * 3 * 64 // 10
@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 
 import numpy as np
+import json
+import time
+import csv
 import gym
 import os
 
@@ -9,6 +12,7 @@ from stable_baselines.common.cmd_util import arg_parser
 from stable_baselines.common import set_global_seeds
 from stable_baselines import bench, logger
 
+from rollout import RolloutBuffer, collect, compute_gae
 from student_env import StudentEnv
 from stable_baselines import PPO2
 
@@ -36,10 +40,119 @@ def init_save_callback(logdir, batch_size, save_interval):
     return callback
 
 
-def train(num_timesteps, logdir, save, save_interval, load, seed):
+def learn_fast(model, envs, total_timesteps, callback=None):
+    """Train `model` (a PPO2) on batches collected straight into a
+    `RolloutBuffer` instead of through the VecEnv/Monitor runner.
+
+    Mirrors `PPO2.learn` with constant learning rate and clip range: each
+    update collects `n_steps` steps of every env, computes GAE advantages and
+    does `noptepochs` epochs of `nminibatches` minibatches. Episode rewards
+    are written to monitor.csv in the logger's directory like `bench.Monitor`.
+    """
+    obs_space = envs[0].observation_space
+    buffer = RolloutBuffer(
+        model.n_steps,
+        len(envs),
+        obs_space.shape,
+        obs_space.dtype,
+        action_shape=envs[0].action_space.shape,
+    )
+    for e, env in enumerate(envs):
+        env.reset()
+        env.observe(out=buffer.next_obs[e])
+
+    n_batch = model.n_steps * len(envs)
+    batch_size = n_batch // model.nminibatches
+    n_updates = total_timesteps // n_batch
+
+    # Same format as bench.Monitor: a json header line then r,l,t rows
+    t_start = time.time()
+    with open(os.path.join(logger.get_dir(), "monitor.csv"), "w") as monitor_file:
+        header = {"t_start": t_start, "env_id": None}
+        monitor_file.write("#" + json.dumps(header) + "\n")
+        monitor = csv.DictWriter(monitor_file, fieldnames=("r", "l", "t"))
+        monitor.writeheader()
+
+        for update in range(1, n_updates + 1):
+            t_update = time.time()
+            episodes = collect(envs, model.step, buffer)
+            model.num_timesteps += n_batch
+            last_values = model.value(buffer.next_obs)
+            compute_gae(buffer, last_values, gamma=model.gamma, lam=model.lam)
+            for reward, length in episodes:
+                monitor.writerow(
+                    {"r": reward, "l": length, "t": round(time.time() - t_start, 6)}
+                )
+            monitor_file.flush()
+
+            batch = [
+                buffer.flatten(array)
+                for array in (
+                    buffer.obs,
+                    buffer.returns,
+                    buffer.dones,
+                    buffer.actions,
+                    buffer.values,
+                    buffer.neglogpacs,
+                )
+            ]
+            losses = []
+            inds = np.arange(n_batch)
+            for _ in range(model.noptepochs):
+                np.random.shuffle(inds)
+                for start in range(0, n_batch, batch_size):
+                    mb = inds[start : start + batch_size]
+                    obs, returns, masks, actions, values, neglogpacs = (
+                        array[mb] for array in batch
+                    )
+                    losses.append(
+                        model._train_step(
+                            model.learning_rate,
+                            model.cliprange,
+                            obs,
+                            returns,
+                            masks,
+                            actions,
+                            values,
+                            neglogpacs,
+                            update=update * n_batch,
+                            writer=None,
+                        )
+                    )
+
+            if model.verbose >= 1:
+                logger.logkv("fps", int(n_batch / (time.time() - t_update)))
+                logger.logkv("total_timesteps", update * n_batch)
+                logger.logkv("n_updates", update)
+                logger.logkv("time_elapsed", time.time() - t_start)
+                if episodes:
+                    logger.logkv("ep_reward_mean", np.mean([r for r, _ in episodes]))
+                for name, value in zip(model.loss_names, np.mean(losses, axis=0)):
+                    logger.logkv(name, value)
+                logger.dumpkvs()
+
+            if callback is not None:
+                if callback({"update": update, "self": model}, {}) is False:
+                    break
+
+    return model
+
+
+def train(
+    num_timesteps,
+    logdir,
+    save,
+    save_interval,
+    load,
+    seed,
+    env_kwargs=None,
+    tf_threads=0,
+    fast_rollouts=False,
+):
     def make_env():
-        env_out = StudentEnv()
-        env_out = bench.Monitor(env_out, logger.get_dir(), allow_early_resets=True)
+        env_out = StudentEnv(**(env_kwargs or {}))
+        if not fast_rollouts:  # learn_fast writes its own monitor.csv
+            env_out = bench.Monitor(env_out, logger.get_dir(), allow_early_resets=True)
         return env_out
 
     env = DummyVecEnv([make_env])
@@ -60,6 +173,7 @@ def train(num_timesteps, logdir, save, save_interval, load, seed):
         learning_rate=3e-4,
         cliprange=0.2,
         verbose=1,
+        n_cpu_tf_sess=tf_threads or None,
     )
 
     if save and save_interval > 0:
@@ -70,7 +184,10 @@ def train(num_timesteps, logdir, save, save_interval, load, seed):
     # Optionally load before or save after training
     if load is not None:
         model.load_parameters(load)
-    model.learn(total_timesteps=num_timesteps, callback=callback)
+    if fast_rollouts:
+        learn_fast(model, env.envs, total_timesteps=num_timesteps, callback=callback)
+    else:
+        model.learn(total_timesteps=num_timesteps, callback=callback)
     if save:
         model.save(logdir + "/model")
 
@@ -87,11 +204,39 @@ def main():
     parser.add_argument("-s", "--save", action="store_true")
     parser.add_argument("-si", "--save-interval", type=float, default=5e4)
     parser.add_argument("-sd", "--seed", type=int, default=-1)
+    parser.add_argument(
+        "-obs", "--observation", choices=["index", "history"], default="index"
+    )
+    parser.add_argument(
+        "-qo", "--question-order", choices=["fixed", "random"], default="fixed"
+    )
+    parser.add_argument("-sl", "--session-length", type=int, default=None)
+    parser.add_argument("-os", "--one-student", action="store_true")
+    parser.add_argument("-fa", "--factored-actions", action="store_true")
+    parser.add_argument(
+        "-r", "--reward", choices=["sample", "expected", "bank_gain"], default="sample"
+    )
+    parser.add_argument(
+        "-fr",
+        "--fast-rollouts",
+        action="store_true",
+        help="Collect batches straight into a rollout buffer (see rollout.py)",
+    )
+    parser.add_argument(
+        "--cpus", type=str, default=None, help="Comma separated CPUs to run on"
+    )
+    parser.add_argument(
+        "-tf", "--tf-threads", type=int, default=0, help="0: let TensorFlow decide"
+    )
     parser.add_argument(
         "-o", "--output-formats", nargs="*", default=["stdout", "log", "csv"]
     )
     args = parser.parse_args()
 
+    # Pin to the given cores before TensorFlow creates its thread pools
+    if args.cpus and hasattr(os, "sched_setaffinity"):  # Linux only
+        os.sched_setaffinity(0, {int(c) for c in args.cpus.split(",")})
+
     # Set default seed
     if args.seed == -1:
         seed = np.random.randint(1, 1000)
@@ -113,6 +258,16 @@ def main():
         save_interval=save_interval,
         load=args.load,
         seed=seed,
+        env_kwargs=dict(
+            observation=args.observation,
+            question_order=args.question_order,
+            session_length=args.session_length,
+            one_student=args.one_student,
+            reward=args.reward,
+            factored_actions=args.factored_actions,
+        ),
+        tf_threads=args.tf_threads,
+        fast_rollouts=args.fast_rollouts,
     )
 
     env.close()